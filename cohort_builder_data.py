@@ -16,17 +16,24 @@ import re
 import sqlite3
 import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, Mapping, Sequence
+from typing import BinaryIO, Callable, Iterable, Mapping, Sequence, TextIO
 from urllib.parse import quote, urlparse
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
 
 
 LOGGER = logging.getLogger(__name__)
 POLICY_URL = "https://www.cancerimagingarchive.net/nih-controlled-data-access-policy/"
 OPEN_ACCESS_LEVELS = {"open", "open_noncommercial"}
+SOURCE_LOADER_WORKERS = 5
 CLINICAL_CATEGORICAL_COLUMNS = (
     "sex_at_birth",
     "race",
@@ -84,6 +91,19 @@ COHORT_EXPORT_COLUMNS = (
     "controlled_files",
     "imaging_linkage_status",
 )
+# The patient index needs only these IDC fields; the series-level descriptions,
+# licenses, and DOIs are read on demand for the selected patient.
+IDC_AGGREGATE_COLUMNS = (
+    "collection_id",
+    "analysis_result_id",
+    "PatientID",
+    "StudyInstanceUID",
+    "StudyDate",
+    "BodyPartExamined",
+    "SeriesInstanceUID",
+    "Modality",
+    "series_size_MB",
+)
 CANONICAL_CATEGORY_VALUES = {
     "sex_at_birth": {
         "m": "Male",
@@ -197,6 +217,18 @@ def normalize_dataset_key(value: object) -> str:
     return re.sub(r"[^a-z0-9]+", "", str(value or "").lower())
 
 
+def _map_distinct(
+    values: pd.Series, convert: Callable[[object], object]
+) -> pd.Series:
+    """Apply ``convert`` once per distinct value and map every row through it.
+
+    Identifier, category, and token columns repeat a few distinct values
+    across many rows, like a Parquet dictionary column. Missing values stay
+    missing; None and NaN would otherwise collide in the lookup index.
+    """
+    return values.map({value: convert(value) for value in values.dropna().unique()})
+
+
 def normalize_subject_key(value: object) -> str:
     """Normalize only casing/outer whitespace within a dataset scope."""
     if value is None:
@@ -246,12 +278,8 @@ def subject_join_keys(frame: pd.DataFrame) -> pd.Series:
     keys = (
         frame["subject_id"].fillna("").astype(str).str.strip().str.casefold()
     )
-    titles = frame["short_title"].fillna("").astype(str)
-    title_keys = titles.map(
-        {
-            title: normalize_dataset_key(title)
-            for title in titles.drop_duplicates().tolist()
-        }
+    title_keys = _map_distinct(
+        frame["short_title"].fillna("").astype(str), normalize_dataset_key
     )
 
     mask = title_keys == "cbisddsm"
@@ -351,10 +379,11 @@ def canonicalize_patient_categories(frame: pd.DataFrame) -> pd.DataFrame:
     for column in CLINICAL_CATEGORICAL_COLUMNS:
         if column not in result:
             continue
-        values = result[column].dropna().map(
-            lambda value: " ".join(str(value).strip().split())
-        )
-        counts = values.value_counts()
+        # Category columns hold few distinct values across many patients, so
+        # normalize each distinct value once and map rows through a lookup.
+        counts = _map_distinct(
+            result[column].dropna(), lambda value: " ".join(str(value).strip().split())
+        ).value_counts()
         representatives: dict[str, str] = {}
         ranked = sorted(
             counts.items(),
@@ -368,13 +397,12 @@ def canonicalize_patient_categories(frame: pd.DataFrame) -> pd.DataFrame:
         for value, _ in ranked:
             representatives.setdefault(normalize_category_key(value), value)
         representatives.update(CANONICAL_CATEGORY_VALUES.get(column, {}))
-        result[column] = result[column].map(
-            lambda value: (
-                representatives.get(normalize_category_key(value), value)
-                if normalize_category_key(value)
-                else value
-            )
-        )
+
+        def canonical(value: object) -> object:
+            key = normalize_category_key(value)
+            return representatives.get(key, value) if key else value
+
+        result[column] = _map_distinct(result[column], canonical)
     return result
 
 
@@ -396,14 +424,25 @@ def _connect_readonly(path: Path) -> sqlite3.Connection:
     return connection
 
 
-def sqlite_objects(path: Path) -> set[str]:
-    if not path.exists():
-        return set()
+@lru_cache(maxsize=32)
+def _sqlite_objects_for(path: Path, mtime_ns: int, size: int) -> frozenset[str]:
     with _connect_readonly(path) as connection:
         rows = connection.execute(
             "SELECT name FROM sqlite_master WHERE type IN ('table', 'view')"
         ).fetchall()
-    return {row[0] for row in rows}
+    return frozenset(row[0] for row in rows)
+
+
+def sqlite_objects(path: Path) -> set[str]:
+    """Return table and view names, reusing the lookup until the file changes.
+
+    Every drill-down loader resolves its preferred object first, so caching
+    the schema avoids opening an extra connection per query on each rerun.
+    """
+    if not path.exists():
+        return set()
+    stat = path.stat()
+    return set(_sqlite_objects_for(path, stat.st_mtime_ns, stat.st_size))
 
 
 def preferred_object(path: Path, *names: str) -> str | None:
@@ -548,25 +587,24 @@ def load_clinical_subjects(path: Path) -> pd.DataFrame:
     frame["subject_id"] = frame["subject_id"].astype(str).str.strip()
     frame = frame[frame["subject_id"] != ""].copy()
     frame["has_clinical"] = True
+    # Coerce each age once and fold the minimum into a single owned buffer so
+    # the baseline needs neither a projected copy of the age columns nor a
+    # fresh array per column.
+    baseline = None
     for column in (
         "age_at_diagnosis",
         "age_at_enrollment_years",
         "age_at_imaging_years",
     ):
-        if column in frame:
-            frame[column] = pd.to_numeric(frame[column], errors="coerce")
-    age_columns = [
-        column
-        for column in (
-            "age_at_diagnosis",
-            "age_at_enrollment_years",
-            "age_at_imaging_years",
-        )
-        if column in frame
-    ]
-    frame["age_at_baseline"] = (
-        frame[age_columns].min(axis=1, skipna=True) if age_columns else pd.NA
-    )
+        if column not in frame:
+            continue
+        frame[column] = pd.to_numeric(frame[column], errors="coerce")
+        ages = frame[column].to_numpy(dtype=float, na_value=np.nan)
+        if baseline is None:
+            baseline = ages.copy()
+        else:
+            np.fmin(baseline, ages, out=baseline)
+    frame["age_at_baseline"] = pd.NA if baseline is None else baseline
     return collapse_clinical_subject_aliases(frame)
 
 
@@ -588,9 +626,9 @@ def load_idc_series(
     # dataset contexts so the cohort inventory can represent the WordPress
     # Collection and Analysis Result independently.
     collection_rows = frame.copy()
-    collection_rows["dataset_key"] = collection_rows["collection_id"].map(
-        normalize_dataset_key
-    )
+    collection_rows["dataset_key"] = _map_distinct(
+        collection_rows["collection_id"], normalize_dataset_key
+    ).astype(object)
     if catalog is not None and not catalog.empty:
         collection_rows["short_title"] = collection_rows["dataset_key"].map(
             key_map
@@ -607,9 +645,9 @@ def load_idc_series(
         analysis_ids = frame["analysis_result_id"].fillna("").astype(str).str.strip()
         result_rows = frame[analysis_ids != ""].copy()
         if not result_rows.empty:
-            result_rows["dataset_key"] = result_rows["analysis_result_id"].map(
-                normalize_dataset_key
-            )
+            result_rows["dataset_key"] = _map_distinct(
+                result_rows["analysis_result_id"], normalize_dataset_key
+            ).astype(object)
             if catalog is not None and not catalog.empty:
                 result_rows["short_title"] = result_rows["dataset_key"].map(key_map)
                 result_rows = result_rows[
@@ -805,27 +843,54 @@ def build_patient_index(paths: DataPaths) -> pd.DataFrame:
             f"No visible TCIA dataset catalog found in {paths.snapshot_db}"
         )
 
-    stage_started = time.perf_counter()
-    clinical = load_clinical_subjects(paths.clinical_db)
+    # The source loaders read independent SQLite files and the IDC Parquet
+    # index, so they run on a small thread pool. Only the SQLite reads and
+    # Parquet decoding release the GIL; the pandas and regex normalization
+    # that dominates the IDC load does not, so the overlap is partial. Each
+    # loader is timed inside its worker so a slow source stays visible.
+    def timed(load, *args):
+        started = time.perf_counter()
+        result = load(*args)
+        return result, time.perf_counter() - started
+
+    def load_idc() -> pd.DataFrame:
+        return aggregate_idc(
+            load_idc_series(
+                paths.idc_parquet, catalog, columns=list(IDC_AGGREGATE_COLUMNS)
+            )
+        )
+
+    with ThreadPoolExecutor(max_workers=SOURCE_LOADER_WORKERS) as executor:
+        clinical_future = executor.submit(
+            timed, load_clinical_subjects, paths.clinical_db
+        )
+        idc_future = executor.submit(timed, load_idc)
+        pathdb_future = executor.submit(timed, aggregate_pathdb, paths.snapshot_db)
+        nifti_future = executor.submit(timed, aggregate_nifti, paths.nifti_db)
+        controlled_future = executor.submit(
+            timed, aggregate_controlled, paths.controlled_db
+        )
+        clinical, clinical_seconds = clinical_future.result()
+        idc, idc_seconds = idc_future.result()
+        pathdb, pathdb_seconds = pathdb_future.result()
+        nifti, nifti_seconds = nifti_future.result()
+        controlled, controlled_seconds = controlled_future.result()
     LOGGER.info(
         "Patient index: loaded %s clinical patients in %.1fs",
         f"{len(clinical):,}",
-        time.perf_counter() - stage_started,
+        clinical_seconds,
     )
-    stage_started = time.perf_counter()
-    idc = aggregate_idc(load_idc_series(paths.idc_parquet, catalog))
     LOGGER.info(
         "Patient index: aggregated %s IDC patients in %.1fs",
         f"{len(idc):,}",
-        time.perf_counter() - stage_started,
+        idc_seconds,
     )
-    stage_started = time.perf_counter()
-    pathdb = aggregate_pathdb(paths.snapshot_db)
-    nifti = aggregate_nifti(paths.nifti_db)
-    controlled = aggregate_controlled(paths.controlled_db)
     LOGGER.info(
-        "Patient index: loaded PathDB, NIfTI, and controlled metadata in %.1fs",
-        time.perf_counter() - stage_started,
+        "Patient index: loaded PathDB in %.1fs, NIfTI in %.1fs, and controlled "
+        "metadata in %.1fs",
+        pathdb_seconds,
+        nifti_seconds,
+        controlled_seconds,
     )
 
     stage_started = time.perf_counter()
@@ -926,19 +991,19 @@ def build_patient_index(paths: DataPaths) -> pd.DataFrame:
     # extraction and crosswalk gaps can be audited instead of hidden.
     patients = exclude_nlst_clinical_only(patients)
 
-    def sources_for(row: pd.Series) -> str:
-        labels = []
-        if row["has_public_dicom"]:
-            labels.append("IDC DICOM")
-        if row["has_nifti"]:
-            labels.append("NIfTI")
-        if row["has_pathdb"]:
-            labels.append("PathDB")
-        if row["has_controlled_metadata"]:
-            labels.append("Controlled-access file metadata")
-        return "; ".join(labels)
-
-    patients["available_imaging"] = patients.apply(sources_for, axis=1)
+    available_imaging = pd.Series("", index=patients.index, dtype=object)
+    for column, label in (
+        ("has_public_dicom", "IDC DICOM"),
+        ("has_nifti", "NIfTI"),
+        ("has_pathdb", "PathDB"),
+        ("has_controlled_metadata", "Controlled-access file metadata"),
+    ):
+        available_imaging = available_imaging.where(
+            ~patients[column],
+            available_imaging.where(available_imaging == "", available_imaging + "; ")
+            + label,
+        )
+    patients["available_imaging"] = available_imaging
     modality_columns = [
         column
         for column in (
@@ -959,12 +1024,19 @@ def build_patient_index(paths: DataPaths) -> pd.DataFrame:
         )
         if column in patients
     ]
-    patients["modalities"] = patients[modality_columns].apply(
-        lambda row: join_tokens(row.tolist()), axis=1
-    )
-    patients["body_parts"] = patients[body_part_columns].apply(
-        lambda row: join_tokens(row.tolist()), axis=1
-    )
+
+    def joined_tokens(columns: list[str]) -> pd.Series:
+        # Few distinct source combinations repeat across many patients, so
+        # tokenize each combination once. Missing and blank values carry no
+        # tokens, so both key as "" within the unit-separated combination.
+        combined = pd.Series("", index=patients.index)
+        for position, column in enumerate(columns):
+            text = patients[column].fillna("").astype(str)
+            combined = text if position == 0 else combined + "\x1f" + text
+        return _map_distinct(combined, lambda key: join_tokens(key.split("\x1f")))
+
+    patients["modalities"] = joined_tokens(modality_columns)
+    patients["body_parts"] = joined_tokens(body_part_columns)
     patients["patient_key"] = (
         patients["short_title"].astype(str)
         + "|"
@@ -1167,16 +1239,20 @@ def build_grouped_patient_index(
             combined["resolved_access_level"] = "mixed"
         return combined
 
-    group_sizes = ordered["patient_group_key"].value_counts()
-    single_keys = set(group_sizes[group_sizes == 1].index)
-    singles = ordered[ordered["patient_group_key"].isin(single_keys)].copy()
-    singles["dataset_memberships"] = singles.apply(
-        lambda row: f"{row['short_title']} [{row.get('dataset_type', 'Dataset')}]",
-        axis=1,
+    # One duplicated() pass splits single memberships from grouped ones; the
+    # same mask then selects both halves.
+    is_single = ~ordered["patient_group_key"].duplicated(keep=False)
+    singles = ordered[is_single].copy()
+    dataset_types = (
+        singles["dataset_type"].astype(str) if "dataset_type" in singles else "Dataset"
+    )
+    singles["dataset_memberships"] = (
+        singles["short_title"].astype(str) + " [" + dataset_types + "]"
     )
     singles["dataset_count"] = 1
-    singles["member_short_titles_json"] = singles["short_title"].map(
-        lambda value: json.dumps([str(value)], separators=(",", ":"))
+    singles["member_short_titles_json"] = _map_distinct(
+        singles["short_title"],
+        lambda value: json.dumps([str(value)], separators=(",", ":")),
     )
     singles["member_patient_keys_json"] = singles["patient_key"].map(
         lambda value: json.dumps([str(value)], separators=(",", ":"))
@@ -1185,9 +1261,7 @@ def build_grouped_patient_index(
 
     grouped_rows = [
         decorate(group)
-        for _, group in ordered[
-            ~ordered["patient_group_key"].isin(single_keys)
-        ].groupby("patient_group_key", sort=False)
+        for _, group in ordered[~is_single].groupby("patient_group_key", sort=False)
     ]
     grouped = pd.concat(
         [singles, pd.DataFrame(grouped_rows)], ignore_index=True, sort=False
@@ -1238,9 +1312,18 @@ def load_patient_idc(
     collection_id: str | None = None,
     analysis_result_id: str | None = None,
     direct_collection_only: bool = False,
+    columns: Sequence[str] | None = None,
 ) -> pd.DataFrame:
     if not paths.idc_parquet.exists():
         return pd.DataFrame()
+    if columns is not None:
+        # Dataset routing and subject matching always need the identifiers.
+        columns = list(
+            dict.fromkeys(
+                ["collection_id", "analysis_result_id", "PatientID", *columns]
+            )
+        )
+    selected_key = subject_join_key(short_title, subject_id)
     if collection_id:
         parquet_filters = [("collection_id", "==", collection_id)]
         if analysis_result_id:
@@ -1249,27 +1332,39 @@ def load_patient_idc(
             )
         frame = pd.read_parquet(
             paths.idc_parquet,
+            columns=columns,
             filters=parquet_filters,
         )
         if not frame.empty:
             frame["short_title"] = short_title
             frame["subject_id"] = frame["PatientID"].astype(str).str.strip()
     else:
-        frame = load_idc_series(paths.idc_parquet, catalog)
+        # Without a collection to filter on, resolve the patient's PatientID
+        # spellings from that single column first, then push them down so
+        # only the patient's series are materialized.
+        patient_ids = pd.read_parquet(paths.idc_parquet, columns=["PatientID"])[
+            "PatientID"
+        ].dropna().unique()
+        matching_ids = [
+            value
+            for value in patient_ids
+            if subject_join_key(short_title, str(value).strip()) == selected_key
+        ]
+        if not selected_key or not matching_ids:
+            return pd.DataFrame()
+        frame = load_idc_series(
+            paths.idc_parquet,
+            catalog,
+            columns=columns,
+            filters=[("PatientID", "in", matching_ids)],
+        )
     if frame.empty:
         return frame
     if direct_collection_only and not analysis_result_id and "analysis_result_id" in frame:
         result_ids = frame["analysis_result_id"].fillna("").astype(str).str.strip()
         frame = frame[result_ids == ""].copy()
-    selected_key = subject_join_key(short_title, subject_id)
-    frame_subject_keys = frame.apply(
-        lambda row: subject_join_key(row["short_title"], row["subject_id"]),
-        axis=1,
-    )
-    return frame[
-        (frame["short_title"] == short_title)
-        & (frame_subject_keys == selected_key)
-    ].copy()
+    frame = frame[frame["short_title"] == short_title]
+    return frame[subject_join_keys(frame) == selected_key].copy()
 
 
 def load_patient_pathdb(
@@ -1480,24 +1575,29 @@ def normalize_study_date(value: object) -> str:
     return text[:10]
 
 
+IDC_SLIM_VIEWER_URL = "https://viewer.imaging.datacommons.cancer.gov/slim/studies/"
+IDC_OHIF_VIEWER_URL = (
+    "https://viewer.imaging.datacommons.cancer.gov/v3/viewer/?StudyInstanceUIDs="
+)
+
+
 def idc_viewer_url(
     study_uid: object,
     series_uid: object,
     modality: object,
     access_level: str | None = None,
 ) -> str:
-    study = str(study_uid or "").strip()
-    series = str(series_uid or "").strip()
+    study = "" if pd.isna(study_uid) else str(study_uid).strip()
+    series = "" if pd.isna(series_uid) else str(series_uid).strip()
     if not study or not series:
         return ""
     if str(modality or "").upper() == "SM":
         return (
-            "https://viewer.imaging.datacommons.cancer.gov/slim/studies/"
+            f"{IDC_SLIM_VIEWER_URL}"
             f"{quote(study, safe='.')}/series/{quote(series, safe='.')}"
         )
     return (
-        "https://viewer.imaging.datacommons.cancer.gov/v3/viewer/"
-        f"?StudyInstanceUIDs={quote(study, safe='.')}"
+        f"{IDC_OHIF_VIEWER_URL}{quote(study, safe='.')}"
         f"&initialSeriesInstanceUID={quote(series, safe='.')}"
     )
 
@@ -1505,18 +1605,26 @@ def idc_viewer_url(
 def add_idc_viewer_urls(
     frame: pd.DataFrame, access_level: str | None = None
 ) -> pd.DataFrame:
+    """Add idc_viewer_url() links, quoting each distinct UID only once."""
     if frame.empty:
         return frame
     result = frame.copy()
-    result["viewer_url"] = result.apply(
-        lambda row: idc_viewer_url(
-            row.get("StudyInstanceUID"),
-            row.get("SeriesInstanceUID"),
-            row.get("Modality"),
-            access_level,
-        ),
-        axis=1,
+
+    def column(name: str) -> pd.Series:
+        return result.get(name, pd.Series(None, index=result.index)).fillna("")
+
+    def quoted(value: object) -> str:
+        return quote(str(value).strip(), safe=".")
+
+    study = _map_distinct(column("StudyInstanceUID"), quoted)
+    series = _map_distinct(column("SeriesInstanceUID"), quoted)
+    is_slide = _map_distinct(
+        column("Modality"), lambda value: str(value).upper() == "SM"
+    ).astype(bool)
+    urls = (IDC_OHIF_VIEWER_URL + study + "&initialSeriesInstanceUID=" + series).where(
+        ~is_slide, IDC_SLIM_VIEWER_URL + study + "/series/" + series
     )
+    result["viewer_url"] = urls.where((study != "") & (series != ""), "")
     result["study_date"] = result["StudyDate"].map(normalize_study_date)
     return result
 
@@ -1550,6 +1658,14 @@ def cart_item(
     }
 
 
+MANIFEST_FILE_NAMES = {
+    "SeriesInstanceUID": "tcia_dicom_series.csv",
+    "imageUrl": "tcia_pathdb_files.csv",
+    "drs_uri": "tcia_controlled_drs.csv",
+}
+MANIFEST_ARCHIVE_NAME = "tcia_data_retriever_manifests.zip"
+
+
 def deduplicate_cart(items: Iterable[Mapping[str, str]]) -> list[dict[str, str]]:
     unique: dict[str, dict[str, str]] = {}
     for item in items:
@@ -1559,13 +1675,41 @@ def deduplicate_cart(items: Iterable[Mapping[str, str]]) -> list[dict[str, str]]
     return list(unique.values())
 
 
+def _write_manifest_csv(sink: BinaryIO, header: str, values: Iterable[str]) -> None:
+    """Write a one-column manifest exactly as csv.writer's minimal quoting would.
+
+    Manifest values are UIDs and URLs that never need quoting, so Arrow's
+    unquoted writer produces the same bytes much faster. Values with CSV
+    structural characters, or empty values, fall back to the csv module.
+    """
+    ordered = sorted(set(values))
+    column = pa.array(ordered, type=pa.string())
+    if len(column) and pc.any(
+        pc.match_substring_regex(column, r'^$|[,"\r\n]')
+    ).as_py():
+        text = io.StringIO(newline="")
+        writer = csv.writer(text, lineterminator="\n")
+        writer.writerow([header])
+        writer.writerows([value] for value in ordered)
+        sink.write(text.getvalue().encode("utf-8"))
+        return
+    sink.write(f"{header}\n".encode("utf-8"))
+    pa_csv.write_csv(
+        pa.table({header: column}),
+        sink,
+        pa_csv.WriteOptions(include_header=False, quoting_style="none"),
+    )
+
+
 def _manifest_csv(header: str, values: Iterable[str]) -> bytes:
-    text = io.StringIO(newline="")
-    writer = csv.writer(text, lineterminator="\n")
-    writer.writerow([header])
-    for value in sorted(set(values)):
-        writer.writerow([value])
-    return text.getvalue().encode("utf-8")
+    buffer = io.BytesIO()
+    _write_manifest_csv(buffer, header, values)
+    return buffer.getvalue()
+
+
+def _archive_text(archive: zipfile.ZipFile, name: str) -> TextIO:
+    """Open a UTF-8 text stream that writes straight into an archive member."""
+    return io.TextIOWrapper(archive.open(name, "w"), encoding="utf-8", newline="")
 
 
 def build_manifest_download(
@@ -1579,19 +1723,21 @@ def build_manifest_download(
     for item in clean:
         groups.setdefault(item["manifest_header"], []).append(item["value"])
     counts = {header: len(set(values)) for header, values in groups.items()}
-    names = {
-        "SeriesInstanceUID": "tcia_dicom_series.csv",
-        "imageUrl": "tcia_pathdb_files.csv",
-        "drs_uri": "tcia_controlled_drs.csv",
-    }
     if len(groups) == 1:
         header, values = next(iter(groups.items()))
-        return _manifest_csv(header, values), names[header], "text/csv", counts
+        return (
+            _manifest_csv(header, values),
+            MANIFEST_FILE_NAMES[header],
+            "text/csv",
+            counts,
+        )
 
     buffer = io.BytesIO()
     with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
         for header, values in groups.items():
-            archive.writestr(names[header], _manifest_csv(header, values))
+            archive.writestr(
+                MANIFEST_FILE_NAMES[header], _manifest_csv(header, values)
+            )
         archive.writestr(
             "README.txt",
             "Extract the archive and open one CSV at a time with TCIA Data "
@@ -1600,12 +1746,24 @@ def build_manifest_download(
         )
     return (
         buffer.getvalue(),
-        "tcia_data_retriever_manifests.zip",
+        MANIFEST_ARCHIVE_NAME,
         "application/zip",
         counts,
     )
 
 
+def manifest_download_target(
+    items: Iterable[Mapping[str, str]],
+) -> tuple[str, str]:
+    """Return the file name and MIME type build_manifest_download produces."""
+    headers = {item["manifest_header"] for item in deduplicate_cart(items)}
+    if not headers:
+        raise ValueError("The shopping cart is empty.")
+    if len(headers) == 1:
+        return MANIFEST_FILE_NAMES[headers.pop()], "text/csv"
+    return MANIFEST_ARCHIVE_NAME, "application/zip"
+
+
 def _cohort_export_patients(frame: pd.DataFrame) -> pd.DataFrame:
     """Return the resolved patient-level fields intended for cohort export."""
     columns = [column for column in COHORT_EXPORT_COLUMNS if column in frame]
@@ -1617,17 +1775,16 @@ def _match_export_rows_to_patients(
 ) -> pd.DataFrame:
     if rows.empty or patients.empty:
         return rows.iloc[0:0].copy()
+    key_columns = ["short_title", "subject_join_key"]
     source = rows.copy()
     source["subject_join_key"] = subject_join_keys(source)
     selected = patients[["short_title", "subject_id"]].copy()
     selected["subject_join_key"] = subject_join_keys(selected)
-    selected = selected[["short_title", "subject_join_key"]].drop_duplicates()
-    return source.merge(
-        selected,
-        on=["short_title", "subject_join_key"],
-        how="inner",
-        validate="many_to_one",
-    )
+    # This is a semi-join: patients contribute no columns, so look the row keys
+    # up in a patient key index instead of hashing both sides for a merge.
+    selected_keys = pd.MultiIndex.from_frame(selected[key_columns])
+    matched = pd.MultiIndex.from_frame(source[key_columns]).isin(selected_keys)
+    return source[matched].reset_index(drop=True)
 
 
 def _filter_export_tokens(
@@ -1638,13 +1795,12 @@ def _filter_export_tokens(
     wanted = {
         str(value).strip().casefold() for value in selected if str(value).strip()
     }
-    return frame[
-        frame[column].map(
-            lambda value: bool(
-                wanted.intersection(token.casefold() for token in split_tokens(value))
-            )
-        )
-    ].copy()
+    matching = [
+        value
+        for value in frame[column].dropna().unique()
+        if wanted.intersection(token.casefold() for token in split_tokens(value))
+    ]
+    return frame[frame[column].isin(matching)].copy()
 
 
 def _read_export_rows(
@@ -1870,6 +2026,14 @@ def collect_filtered_imaging_routes(
     return clean_routes, unrouted_frame
 
 
+def _write_frame_csv(
+    archive: zipfile.ZipFile, name: str, frame: pd.DataFrame
+) -> None:
+    """Stream a frame's CSV into an archive member without a full text copy."""
+    with _archive_text(archive, name) as text:
+        frame.to_csv(text, index=False)
+
+
 def build_filtered_cohort_download(
     patients: pd.DataFrame,
     routes: Mapping[str, Sequence[str]],
@@ -1878,30 +2042,24 @@ def build_filtered_cohort_download(
     """Build a clinical CSV plus route-specific Data Retriever manifests."""
     if patients.empty:
         raise ValueError("The filtered cohort is empty.")
-    route_names = {
-        "SeriesInstanceUID": "tcia_dicom_series.csv",
-        "imageUrl": "tcia_pathdb_files.csv",
-        "drs_uri": "tcia_controlled_drs.csv",
-    }
     counts = {"patients": len(patients)}
     buffer = io.BytesIO()
     with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
-        patient_csv = (
-            _cohort_export_patients(patients).to_csv(index=False).encode("utf-8")
+        _write_frame_csv(
+            archive, "tcia_filtered_patients.csv", _cohort_export_patients(patients)
         )
-        archive.writestr("tcia_filtered_patients.csv", patient_csv)
         for header, values in routes.items():
             clean_values = sorted(
                 set(str(value).strip() for value in values if str(value).strip())
             )
-            if not clean_values or header not in route_names:
+            if not clean_values or header not in MANIFEST_FILE_NAMES:
                 continue
-            archive.writestr(route_names[header], _manifest_csv(header, clean_values))
+            with archive.open(MANIFEST_FILE_NAMES[header], "w") as sink:
+                _write_manifest_csv(sink, header, clean_values)
             counts[header] = len(clean_values)
         if unrouted is not None and not unrouted.empty:
-            archive.writestr(
-                "tcia_unrouted_imaging_inventory.csv",
-                unrouted.to_csv(index=False).encode("utf-8"),
+            _write_frame_csv(
+                archive, "tcia_unrouted_imaging_inventory.csv", unrouted
             )
             counts["unrouted_imaging"] = len(unrouted)
         archive.writestr(
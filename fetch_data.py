@@ -9,7 +9,6 @@ from pathlib import Path
 import pandas as pd
 import pyarrow as pa
 import pyarrow.parquet as pq
-from idc_index import IDCClient
 
 
 IDC_COLUMNS = [
@@ -34,12 +33,43 @@ IDC_COLUMNS = [
 STRING_COLUMNS = [
     column for column in IDC_COLUMNS if column not in {"instanceCount", "series_size_MB"}
 ]
+IDC_VERSION_METADATA_KEY = b"idc_version"
 
 
-def refresh_idc_metadata(output_path: Path, batch_size: int = 20) -> None:
-    """Atomically export the complete current IDC series index to Parquet."""
+def stored_idc_version(path: Path) -> str | None:
+    """Return the IDC version recorded in an exported Parquet index, if any."""
+    try:
+        metadata = pq.read_schema(path).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    version = metadata.get(IDC_VERSION_METADATA_KEY)
+    return version.decode() if version else None
+
+
+def export_is_current(path: Path, idc_version: str) -> bool:
+    """Return whether ``path`` holds this IDC version with the current columns."""
+    if stored_idc_version(path) != idc_version:
+        return False
+    return pq.read_schema(path).names == IDC_COLUMNS
+
+
+def refresh_idc_metadata(
+    output_path: Path, batch_size: int = 20, force: bool = False
+) -> None:
+    """Atomically export the complete current IDC series index to Parquet.
+
+    The export is skipped when ``output_path`` already records the current
+    idc-index data version and column list, unless ``force`` is set.
+    """
+    from idc_index import IDCClient
+
     client = IDCClient.client()
-    print(f"Using idc-index {client.get_idc_version()}.")
+    idc_version = str(client.get_idc_version())
+    print(f"Using idc-index {idc_version}.")
+    output_path = output_path.expanduser().resolve()
+    if not force and export_is_current(output_path, idc_version):
+        print(f"{output_path} already holds IDC {idc_version}; skipping export.")
+        return
 
     collections = client.sql_query(
         "SELECT DISTINCT collection_id FROM index "
@@ -67,7 +97,6 @@ def refresh_idc_metadata(output_path: Path, batch_size: int = 20) -> None:
         f"{float(stats['size_TB']):,.3f} TB."
     )
 
-    output_path = output_path.expanduser().resolve()
     output_path.parent.mkdir(parents=True, exist_ok=True)
     temporary_path = output_path.with_suffix(output_path.suffix + ".tmp")
     writer: pq.ParquetWriter | None = None
@@ -95,9 +124,15 @@ def refresh_idc_metadata(output_path: Path, batch_size: int = 20) -> None:
 
             table = pa.Table.from_pandas(frame[IDC_COLUMNS], preserve_index=False)
             if writer is None:
+                schema = table.schema.with_metadata(
+                    {
+                        **(table.schema.metadata or {}),
+                        IDC_VERSION_METADATA_KEY: idc_version.encode(),
+                    }
+                )
                 writer = pq.ParquetWriter(
                     temporary_path,
-                    table.schema,
+                    schema,
                     compression="zstd",
                     use_dictionary=True,
                 )
@@ -133,10 +168,15 @@ def main() -> None:
         help="Destination Parquet path (default: repository idc_metadata.parquet)",
     )
     parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Export even when the output already holds the current IDC version",
+    )
     args = parser.parse_args()
     if args.batch_size < 1:
         parser.error("--batch-size must be at least 1")
-    refresh_idc_metadata(args.output, args.batch_size)
+    refresh_idc_metadata(args.output, args.batch_size, force=args.force)
 
 
 if __name__ == "__main__":
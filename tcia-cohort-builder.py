@@ -8,6 +8,7 @@ import json
 import logging
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
@@ -29,13 +30,79 @@ from cohort_builder_data import (
     load_patient_nifti,
     load_patient_nifti_packages,
     load_patient_pathdb,
+    manifest_download_target,
     resolve_data_paths,
     split_tokens,
 )
 
 
-PATIENT_INDEX_SCHEMA_VERSION = 4
+PATIENT_INDEX_SCHEMA_VERSION = 8
 APP_DIR = Path(__file__).resolve().parent
+CATEGORICAL_COLUMNS = (
+    "resolved_access_level",
+    "primary_diagnosis",
+    "primary_site",
+    "sex_at_birth",
+    "vital_status",
+    "race",
+    "ethnicity",
+    "available_imaging",
+    "imaging_linkage_status",
+    "modalities",
+    "body_parts",
+)
+COUNT_COLUMNS = (
+    "source_count",
+    "conflict_count",
+    "dicom_series",
+    "dicom_studies",
+    "dicom_timepoints",
+    "pathdb_slides",
+    "pathdb_viewable_slides",
+    "nifti_files",
+    "nifti_studies",
+    "nifti_timepoints",
+    "nifti_derived_objects",
+    "controlled_files",
+    "controlled_series",
+    "controlled_studies",
+    "controlled_timepoints",
+    "controlled_manifest_items",
+    "download_records",
+    "pathdb_collection_slide_count",
+    "pathdb_collection_patient_count",
+)
+RESULT_TABLE_COLUMNS = (
+    "dataset_memberships",
+    "subject_id",
+    "resolved_access_level",
+    "primary_diagnosis",
+    "primary_site",
+    "modalities",
+    "available_imaging",
+    "conflict_count",
+)
+# Column configs are plain specs, so the results table reuses one set rather
+# than rebuilding it on every rerun.
+RESULT_TABLE_COLUMN_CONFIG = {
+    "dataset_memberships": st.column_config.TextColumn(
+        "Dataset memberships", pinned=True, width="large"
+    ),
+    "subject_id": st.column_config.TextColumn("Patient", pinned=True),
+    "resolved_access_level": st.column_config.TextColumn("Access"),
+    "primary_diagnosis": st.column_config.TextColumn("Diagnosis"),
+    "primary_site": st.column_config.TextColumn("Site"),
+    "conflict_count": st.column_config.NumberColumn("Conflicts"),
+}
+IDC_DETAIL_COLUMNS = (
+    "StudyInstanceUID",
+    "StudyDate",
+    "Modality",
+    "SeriesDescription",
+    "BodyPartExamined",
+    "instanceCount",
+    "SeriesInstanceUID",
+)
 BRAND_SKILL_DIR = Path.home() / ".codex" / "skills" / "tcia-brand-guidelines"
 LOGO_PATH = BRAND_SKILL_DIR / "assets" / "tcia-logo-dark.svg"
 OFFICIAL_LOGO_URL = (
@@ -145,12 +212,57 @@ st.markdown(
 )
 
 
-@st.cache_data(show_spinner="Building the patient-level index…")
+# Persist the built views so a server restart reuses them. The cache key
+# carries every source's size and mtime, so refreshed caches rebuild.
+@st.cache_data(
+    show_spinner="Building the patient-level index…",
+    persist="disk",
+    max_entries=2,
+)
 def cached_patient_views(
     paths: DataPaths, signatures: tuple
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
     patients = build_patient_index(paths)
-    return build_grouped_patient_index(patients)
+    grouped, members = build_grouped_patient_index(patients)
+    # Filter and label columns hold a handful of values across every patient.
+    # Categorical storage lets isin(), unique(), and token maps work on codes.
+    for column in CATEGORICAL_COLUMNS:
+        if column in grouped:
+            grouped[column] = grouped[column].astype("category")
+    # Outer merges leave the per-source counts as float64 only to carry NaN.
+    # They are whole numbers far below float32's exact-integer limit, so the
+    # narrower dtype halves their share of the cached views losslessly.
+    for frame in (grouped, members):
+        for column in COUNT_COLUMNS:
+            if column in frame:
+                frame[column] = pd.to_numeric(
+                    frame[column], errors="coerce"
+                ).astype("float32")
+    # Search input cannot contain newlines, so one newline-joined, casefolded
+    # column matches exactly like searching each field separately.
+    if grouped.empty:
+        grouped["search_text"] = pd.Series(dtype=str)
+    else:
+        grouped["search_text"] = (
+            grouped["dataset_memberships"].astype(str)
+            + "\n"
+            + grouped["subject_id"].astype(str)
+            + "\n"
+            + grouped.get("title", pd.Series("", index=grouped.index)).astype(str)
+        ).str.casefold()
+    return grouped, members
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def shared_patient_views(
+    paths: DataPaths, cache_key: tuple
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Hold one read-only copy of the persisted views for every session.
+
+    cache_data returns a fresh unpickled copy on each call, so reruns would
+    otherwise deserialize both views every time. Callers must not mutate them.
+    """
+    return cached_patient_views(paths, cache_key)
 
 
 @st.cache_data(show_spinner=False)
@@ -158,13 +270,120 @@ def cached_catalog(paths: DataPaths, signatures: tuple) -> pd.DataFrame:
     return load_dataset_catalog(paths.snapshot_db)
 
 
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cached_key_positions(
+    paths: DataPaths, cache_key: tuple
+) -> tuple[dict[str, object], dict[str, object]]:
+    """Map patient and group keys to row positions for detail-panel lookups."""
+    patients, membership_rows = shared_patient_views(paths, cache_key)
+    return (
+        patients.groupby("patient_key", sort=False).indices,
+        membership_rows.groupby("patient_group_key", sort=False).indices,
+    )
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cached_dataset_positions(
+    paths: DataPaths, cache_key: tuple
+) -> dict[str, np.ndarray]:
+    """Map each member dataset short title to the patient rows that include it."""
+    patients, _ = shared_patient_views(paths, cache_key)
+    encoded = patients.get(
+        "member_short_titles_json",
+        pd.Series(None, index=patients.index, dtype=object),
+    )
+    positions: dict[str, list[int]] = {}
+    for position, (value, short_title) in enumerate(
+        zip(encoded.to_numpy(), patients["short_title"].to_numpy())
+    ):
+        for title in set(decode_member_short_titles(value, short_title)):
+            positions.setdefault(title, []).append(position)
+    return {title: np.array(rows) for title, rows in positions.items()}
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cached_token_positions(
+    paths: DataPaths, cache_key: tuple, column: str
+) -> dict[str, np.ndarray]:
+    """Map each modality or body-part token to the patient rows carrying it."""
+    patients, _ = shared_patient_views(paths, cache_key)
+    if column not in patients:
+        return {}
+    values = patients[column]
+    # Token strings repeat across many patients; split each distinct one once.
+    token_rows: dict[str, list[np.ndarray]] = {}
+    for value, rows in values.groupby(values, observed=True, sort=False).indices.items():
+        for token in set(split_tokens(value)):
+            token_rows.setdefault(token, []).append(rows)
+    return {token: np.concatenate(rows) for token, rows in token_rows.items()}
+
+
+@st.cache_data(show_spinner=False)
+def cached_static_options(paths: DataPaths, cache_key: tuple) -> dict[str, list[str]]:
+    """Return filter options drawn from the complete, unfiltered index."""
+    patients, membership_rows = shared_patient_views(paths, cache_key)
+    options = {
+        "short_title": option_values(membership_rows, "short_title"),
+        "resolved_access_level": option_values(patients, "resolved_access_level"),
+        "modalities": token_options(patients, "modalities"),
+        "body_parts": token_options(patients, "body_parts"),
+    }
+    for column in ("primary_diagnosis", "primary_site", "sex_at_birth", "vital_status"):
+        options[column] = option_values(patients, column)
+    return options
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def cached_basic_filter_mask(
+    paths: DataPaths,
+    cache_key: tuple,
+    search: str,
+    datasets: tuple[str, ...],
+    access: tuple[str, ...],
+    imaging: tuple[str, ...],
+) -> pd.Series:
+    """Combine the basic filters into one mask, reused until a filter changes."""
+    patients, _ = shared_patient_views(paths, cache_key)
+    mask = pd.Series(True, index=patients.index)
+    if search:
+        mask &= patients["search_text"].str.contains(search.casefold(), regex=False)
+    if datasets:
+        dataset_positions = cached_dataset_positions(paths, cache_key)
+        in_datasets = pd.Series(False, index=patients.index)
+        for title in datasets:
+            in_datasets.iloc[dataset_positions.get(title, [])] = True
+        mask &= in_datasets
+    if access:
+        mask &= patients["resolved_access_level"].isin(access)
+    if imaging:
+        source_columns = {
+            "IDC DICOM": "has_public_dicom",
+            "NIfTI": "has_nifti",
+            "PathDB": "has_pathdb",
+            "Controlled-access file metadata": "has_controlled_metadata",
+        }
+        imaging_mask = pd.Series(False, index=patients.index)
+        for source in imaging:
+            imaging_mask |= patients[source_columns[source]].fillna(False)
+        mask &= imaging_mask
+    return mask
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def cached_manifest_download(
+    items: list[dict[str, str]],
+) -> tuple[bytes, str, str, dict[str, int]]:
+    """Rebuild the sidebar manifest only when the cart contents change."""
+    return build_manifest_download(items)
+
+
 def option_values(frame: pd.DataFrame, column: str) -> list[str]:
     if column not in frame:
         return []
     return sorted(
         {
             str(value).strip()
-            for value in frame[column].dropna()
+            for value in frame[column].dropna().unique()
             if str(value).strip()
         },
         key=str.casefold,
@@ -175,20 +394,25 @@ def token_options(frame: pd.DataFrame, column: str) -> list[str]:
     if column not in frame:
         return []
     values: set[str] = set()
-    for value in frame[column].dropna():
+    for value in frame[column].dropna().unique():
         values.update(split_tokens(value))
     return sorted(values, key=str.casefold)
 
 
 def apply_token_filter(
-    frame: pd.DataFrame, column: str, selected: list[str]
+    patients: pd.DataFrame,
+    frame: pd.DataFrame,
+    positions: dict[str, np.ndarray],
+    selected: list[str],
 ) -> pd.DataFrame:
-    if not selected or column not in frame:
+    """Keep rows of ``frame``, a slice of ``patients``, carrying a selected token."""
+    if not selected:
         return frame
-    wanted = set(selected)
-    return frame[
-        frame[column].map(lambda value: bool(wanted.intersection(split_tokens(value))))
-    ]
+    hits = np.zeros(len(patients), dtype=bool)
+    for token in selected:
+        if token in positions:
+            hits[positions[token]] = True
+    return frame[hits[patients.index.get_indexer(frame.index)]]
 
 
 def safe_int(value: object) -> int:
@@ -285,10 +509,13 @@ def render_brand_and_cart() -> None:
             st.session_state.cart_items = []
             st.rerun()
 
-    payload, filename, mime, _ = build_manifest_download(items)
+    # Build the manifest only when the button is clicked; the file name and
+    # MIME type depend only on which routes the cart holds.
+    filename, mime = manifest_download_target(items)
+    cart_snapshot = list(items)
     st.sidebar.download_button(
         "Download manifest",
-        data=payload,
+        data=lambda: cached_manifest_download(cart_snapshot)[0],
         file_name=filename,
         mime=mime,
         type="primary",
@@ -325,17 +552,17 @@ def cohort_export_fingerprint(
 ) -> str:
     digest = hashlib.sha256()
     patient_keys = sorted(patients.get("patient_key", pd.Series(dtype=str)).astype(str))
-    for value in patient_keys:
-        digest.update(value.encode("utf-8"))
-        digest.update(b"\0")
+    # One encoded buffer hashes identically to per-key updates while avoiding
+    # two small bytes objects and digest calls for every patient.
+    if patient_keys:
+        digest.update(("\0".join(patient_keys) + "\0").encode("utf-8"))
     for group in (imaging_sources, modalities, body_parts):
         digest.update("\x1f".join(sorted(group, key=str.casefold)).encode("utf-8"))
         digest.update(b"\0")
     return digest.hexdigest()
 
 
-def member_short_titles(patient: pd.Series) -> list[str]:
-    value = patient.get("member_short_titles_json")
+def decode_member_short_titles(value: object, short_title: object) -> list[str]:
     if pd.notna(value) and str(value).strip():
         try:
             decoded = json.loads(str(value))
@@ -343,14 +570,20 @@ def member_short_titles(patient: pd.Series) -> list[str]:
                 return [str(item) for item in decoded]
         except json.JSONDecodeError:
             pass
-    return [str(patient.get("short_title", ""))]
+    return [str(short_title)]
 
 
-def dataset_membership_count(frame: pd.DataFrame) -> int:
-    titles: set[str] = set()
-    for _, row in frame.iterrows():
-        titles.update(member_short_titles(row))
-    return len(titles)
+def dataset_membership_count(
+    patients: pd.DataFrame,
+    frame: pd.DataFrame,
+    positions: dict[str, np.ndarray],
+) -> int:
+    """Count member datasets of ``frame``, a slice of ``patients``."""
+    if frame is patients:
+        return len(positions)
+    visible = np.zeros(len(patients), dtype=bool)
+    visible[patients.index.get_indexer(frame.index)] = True
+    return sum(1 for rows in positions.values() if visible[rows].any())
 
 
 def render_filtered_cohort_export(
@@ -376,22 +609,18 @@ def render_filtered_cohort_export(
                 ),
                 key="draft_export_related_contexts",
             )
-        route_patients = membership_rows
-        direct_collection_titles: list[str] = []
-        if selected_datasets and not include_related:
-            route_patients = route_patients[
-                route_patients["short_title"].isin(selected_datasets)
-            ]
-            direct_collection_titles = route_patients.loc[
-                route_patients["dataset_type"] == "Collection", "short_title"
-            ].drop_duplicates().astype(str).tolist()
-        fingerprint = cohort_export_fingerprint(
-            patients,
-            imaging_sources,
-            modalities,
-            body_parts + selected_datasets + [str(include_related)],
-        )
+        # The fingerprint sorts and hashes every patient key. Compute it only
+        # when a prepared package must be validated or a new one is built.
+        def export_fingerprint() -> str:
+            return cohort_export_fingerprint(
+                patients,
+                imaging_sources,
+                modalities,
+                body_parts + selected_datasets + [str(include_related)],
+            )
+
         prepared = st.session_state.get("draft_cohort_export")
+        fingerprint = export_fingerprint() if prepared else None
         stale_export = bool(
             prepared and prepared.get("fingerprint") != fingerprint
         )
@@ -418,6 +647,17 @@ def render_filtered_cohort_export(
             disabled=patients.empty,
             key="draft_prepare_cohort_export",
         ):
+            route_patients = membership_rows
+            direct_collection_titles: list[str] = []
+            if selected_datasets and not include_related:
+                route_patients = route_patients[
+                    route_patients["short_title"].isin(selected_datasets)
+                ]
+                direct_collection_titles = route_patients.loc[
+                    route_patients["dataset_type"] == "Collection", "short_title"
+                ].drop_duplicates().astype(str).tolist()
+            if fingerprint is None:
+                fingerprint = export_fingerprint()
             with st.spinner("Collecting clinical rows and filtered imaging routes…"):
                 routes, unrouted = collect_filtered_imaging_routes(
                     paths,
@@ -513,6 +753,55 @@ def render_patient_summary(patient: pd.Series) -> None:
         st.info("Dataset-scope inference used for: " + ", ".join(inferred) + ". Review provenance before analysis.")
 
 
+# Every widget interaction reruns the script, so memoize the selected
+# patient's drill-down reads instead of querying the caches again.
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_patient_sources(
+    paths: DataPaths,
+    signatures: tuple,
+    _catalog: pd.DataFrame,
+    short_title: str,
+    idc_subject: str,
+    pathdb_subject: str,
+    nifti_subject: str,
+    controlled_subject: str,
+    *,
+    collection_id: str | None,
+    analysis_result_id: str | None,
+    direct_collection_only: bool,
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    dicom = load_patient_idc(
+        paths,
+        _catalog,
+        short_title,
+        idc_subject,
+        collection_id=collection_id,
+        analysis_result_id=analysis_result_id,
+        direct_collection_only=direct_collection_only,
+        columns=IDC_DETAIL_COLUMNS,
+    )
+    pathdb = load_patient_pathdb(paths.snapshot_db, short_title, pathdb_subject)
+    nifti = load_patient_nifti(paths.nifti_db, short_title, nifti_subject)
+    nifti_packages = load_patient_nifti_packages(
+        paths.nifti_db, short_title, nifti_subject
+    )
+    controlled = load_patient_controlled(paths.controlled_db, short_title, controlled_subject)
+    return dicom, pathdb, nifti, nifti_packages, controlled
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_clinical_facts(
+    paths: DataPaths,
+    signatures: tuple,
+    short_title: str,
+    subject_id: str,
+    subject_ids: tuple[str, ...],
+) -> pd.DataFrame:
+    return load_patient_clinical_facts(
+        paths.clinical_db, short_title, subject_id, subject_ids=list(subject_ids)
+    )
+
+
 def render_imaging(
     paths: DataPaths,
     catalog: pd.DataFrame,
@@ -534,21 +823,19 @@ def render_imaging(
         if pd.notna(patient.get("idc_analysis_result_id")) and str(patient.get("idc_analysis_result_id")).strip()
         else None
     )
-    dicom = load_patient_idc(
+    dicom, pathdb, nifti, nifti_packages, controlled = cached_patient_sources(
         paths,
+        paths.signatures(),
         catalog,
         short_title,
         idc_subject,
+        pathdb_subject,
+        nifti_subject,
+        controlled_subject,
         collection_id=collection_id,
         analysis_result_id=analysis_result_id,
         direct_collection_only=direct_collection_only,
     )
-    pathdb = load_patient_pathdb(paths.snapshot_db, short_title, pathdb_subject)
-    nifti = load_patient_nifti(paths.nifti_db, short_title, nifti_subject)
-    nifti_packages = load_patient_nifti_packages(
-        paths.nifti_db, short_title, nifti_subject
-    )
-    controlled = load_patient_controlled(paths.controlled_db, short_title, controlled_subject)
 
     source_tabs = st.tabs(
         [
@@ -597,7 +884,7 @@ def render_imaging(
                                 source="IDC",
                                 access_level="open",
                             )
-                            for _, row in shown.iterrows()
+                            for row in shown.to_dict("records")
                         ]
                     )
                 )
@@ -620,7 +907,7 @@ def render_imaging(
                     "Data Retriever routes. The links below open the full Aspera "
                     "package(s) containing these files."
                 )
-                for _, package in nifti_packages.iterrows():
+                for package in nifti_packages.to_dict("records"):
                     package_id = str(package.get("download_id", "")).strip()
                     label = str(package.get("download_label", "")).strip()
                     if not label:
@@ -665,7 +952,7 @@ def render_imaging(
                                 source="PathDB",
                                 access_level=access,
                             )
-                            for _, row in routed.iterrows()
+                            for row in routed.to_dict("records")
                         ]
                     )
                 )
@@ -694,7 +981,7 @@ def render_imaging(
                                 source=str(row.get("route_system", "controlled")),
                                 access_level="controlled",
                             )
-                            for _, row in routed.iterrows()
+                            for row in routed.to_dict("records")
                         ]
                     )
                 )
@@ -773,11 +1060,12 @@ def render_patient_detail(
             if query_key in seen_queries:
                 continue
             seen_queries.add(query_key)
-            facts = load_patient_clinical_facts(
-                paths.clinical_db,
+            facts = cached_clinical_facts(
+                paths,
+                paths.signatures(),
                 short_title,
                 clinical_subject,
-                subject_ids=clinical_ids,
+                tuple(clinical_ids),
             )
             if not facts.empty:
                 facts.insert(0, "dataset_context", short_title)
@@ -855,7 +1143,7 @@ def main() -> None:
         st.stop()
 
     try:
-        patients, membership_rows = cached_patient_views(paths, cache_key)
+        patients, membership_rows = shared_patient_views(paths, cache_key)
         catalog = cached_catalog(paths, signatures)
     except Exception as exc:
         st.exception(exc)
@@ -867,55 +1155,66 @@ def main() -> None:
     st.markdown("<div class='section-label'>Cohort controls</div>", unsafe_allow_html=True)
     f1, f2, f3, f4 = st.columns([1.35, 1, .8, 1])
     search = f1.text_input("Search", placeholder="Dataset or patient ID", key="draft_search").strip()
+    static_options = cached_static_options(paths, cache_key)
     datasets = f2.multiselect(
         "Dataset",
-        option_values(membership_rows, "short_title"),
+        static_options["short_title"],
         key="draft_datasets",
     )
-    access = f3.multiselect("Access", option_values(patients, "resolved_access_level"), format_func=access_label, key="draft_access")
+    access = f3.multiselect("Access", static_options["resolved_access_level"], format_func=access_label, key="draft_access")
     imaging = f4.multiselect("Available imaging", ["IDC DICOM", "NIfTI", "PathDB", "Controlled-access file metadata"], key="draft_imaging")
 
-    working = patients.copy()
-    if search:
-        pattern = search.casefold()
-        working = working[
-            working["dataset_memberships"].astype(str).str.casefold().str.contains(pattern, regex=False)
-            | working["subject_id"].astype(str).str.casefold().str.contains(pattern, regex=False)
-            | working.get("title", "").astype(str).str.casefold().str.contains(pattern, regex=False)
-        ]
-    if datasets:
-        wanted_datasets = set(datasets)
-        working = working[
-            working.apply(
-                lambda row: bool(
-                    wanted_datasets.intersection(member_short_titles(row))
-                ),
-                axis=1,
+    # The index is read-only here, so an unfiltered rerun reuses it directly
+    # instead of copying every column.
+    working = (
+        patients[
+            cached_basic_filter_mask(
+                paths,
+                cache_key,
+                search,
+                tuple(datasets),
+                tuple(access),
+                tuple(imaging),
             )
         ]
-    if access:
-        working = working[working["resolved_access_level"].isin(access)]
-    if imaging:
-        source_columns = {
-            "IDC DICOM": "has_public_dicom",
-            "NIfTI": "has_nifti",
-            "PathDB": "has_pathdb",
-            "Controlled-access file metadata": "has_controlled_metadata",
-        }
-        mask = pd.Series(False, index=working.index)
-        for source in imaging:
-            mask |= working[source_columns[source]].fillna(False)
-        working = working[mask]
+        if search or datasets or access or imaging
+        else patients
+    )
 
     with st.expander("Advanced clinical and imaging filters", expanded=False):
         a1, a2, a3 = st.columns(3)
-        modalities = a1.multiselect("Modality", token_options(working, "modalities"), key="draft_modalities")
-        working = apply_token_filter(working, "modalities", modalities)
-        body_parts = a2.multiselect("Body part", token_options(working, "body_parts"), key="draft_body_parts")
-        working = apply_token_filter(working, "body_parts", body_parts)
+        # Until a filter narrows the cohort, every option list matches the
+        # cached options drawn from the full index.
+        modality_options = (
+            static_options["modalities"]
+            if working is patients
+            else token_options(working, "modalities")
+        )
+        modalities = a1.multiselect("Modality", modality_options, key="draft_modalities")
+        working = apply_token_filter(
+            patients,
+            working,
+            cached_token_positions(paths, cache_key, "modalities"),
+            modalities,
+        )
+        body_part_options = (
+            static_options["body_parts"]
+            if working is patients
+            else token_options(working, "body_parts")
+        )
+        body_parts = a2.multiselect("Body part", body_part_options, key="draft_body_parts")
+        working = apply_token_filter(
+            patients,
+            working,
+            cached_token_positions(paths, cache_key, "body_parts"),
+            body_parts,
+        )
         conflicts = a3.checkbox("Clinical conflicts only", key="draft_conflicts")
+        # Later options cascade from earlier selections, but only the option
+        # column needs slicing; the cohort itself is sliced once at the end.
+        clinical_mask = pd.Series(True, index=working.index)
         if conflicts:
-            working = working[pd.to_numeric(working["conflict_count"], errors="coerce").fillna(0) > 0]
+            clinical_mask &= pd.to_numeric(working["conflict_count"], errors="coerce").fillna(0) > 0
 
         c1, c2, c3, c4 = st.columns(4)
         clinical_filters = [
@@ -925,17 +1224,29 @@ def main() -> None:
             (c4, "Vital status", "vital_status", "draft_vital"),
         ]
         clinical_values: dict[str, list[str]] = {}
+        narrowed = working is not patients or conflicts
         for container, label, column, key in clinical_filters:
-            selected = container.multiselect(label, option_values(working, column), key=key)
+            if narrowed:
+                candidates = working.loc[clinical_mask, working.columns.intersection([column])]
+                options = option_values(candidates, column)
+            else:
+                options = static_options[column]
+            selected = container.multiselect(label, options, key=key)
             clinical_values[column] = selected
             if selected:
-                working = working[working[column].isin(selected)]
+                clinical_mask &= working[column].isin(selected)
+                narrowed = True
+        if not clinical_mask.all():
+            working = working[clinical_mask]
 
     reset_col, count_col = st.columns([.18, .82], vertical_alignment="center")
     reset_col.button("Clear filters", on_click=clear_filters, width="stretch")
+    dataset_count = dataset_membership_count(
+        patients, working, cached_dataset_positions(paths, cache_key)
+    )
     count_col.markdown(
         f"**{len(working):,} matching patients** across "
-        f"**{dataset_membership_count(working) if not working.empty else 0:,} datasets**"
+        f"**{dataset_count:,} datasets**"
     )
 
     render_filter_chips(
@@ -954,10 +1265,15 @@ def main() -> None:
         ]
     )
 
-    visible_group_keys = set(working["patient_group_key"].astype(str))
-    visible_memberships = membership_rows[
-        membership_rows["patient_group_key"].astype(str).isin(visible_group_keys)
-    ].copy()
+    # Group keys are built as strings and the renderers only read these rows,
+    # so one isin() mask slices the memberships without a defensive copy.
+    visible_memberships = (
+        membership_rows[
+            membership_rows["patient_group_key"].isin(working["patient_group_key"])
+        ]
+        if working is not patients
+        else membership_rows
+    )
 
     render_filtered_cohort_export(
         paths,
@@ -977,38 +1293,18 @@ def main() -> None:
             st.info("No patients match these filters. Remove a filter to broaden the cohort.")
         else:
             display_columns = [
-                column
-                for column in (
-                    "dataset_memberships",
-                    "subject_id",
-                    "resolved_access_level",
-                    "primary_diagnosis",
-                    "primary_site",
-                    "modalities",
-                    "available_imaging",
-                    "conflict_count",
-                )
-                if column in working
+                column for column in RESULT_TABLE_COLUMNS if column in working
             ]
             page_size = min(50, len(working))
             result = st.dataframe(
-                working[display_columns].head(page_size),
+                working.head(page_size)[display_columns],
                 hide_index=True,
                 width="stretch",
                 height=560,
                 on_select="rerun",
                 selection_mode="single-row",
                 key="draft_patient_table",
-                column_config={
-                    "dataset_memberships": st.column_config.TextColumn(
-                        "Dataset memberships", pinned=True, width="large"
-                    ),
-                    "subject_id": st.column_config.TextColumn("Patient", pinned=True),
-                    "resolved_access_level": st.column_config.TextColumn("Access"),
-                    "primary_diagnosis": st.column_config.TextColumn("Diagnosis"),
-                    "primary_site": st.column_config.TextColumn("Site"),
-                    "conflict_count": st.column_config.NumberColumn("Conflicts"),
-                },
+                column_config=RESULT_TABLE_COLUMN_CONFIG,
             )
             st.caption(f"Showing the first {page_size:,} matches. Select one row to inspect it alongside the cohort.")
             if result.selection.rows:
@@ -1017,19 +1313,20 @@ def main() -> None:
 
     with detail_col:
         selected_key = st.session_state.get("selected_patient_key")
-        selected = patients[patients["patient_key"] == selected_key]
-        visible_keys = set(working["patient_key"].tolist()) if not working.empty else set()
-        if selected.empty or selected_key not in visible_keys:
-            if selected_key not in visible_keys:
-                st.session_state.pop("selected_patient_key", None)
+        patient_positions, membership_positions = cached_key_positions(paths, cache_key)
+        selected = patients.iloc[patient_positions.get(selected_key, [])]
+        # Filtering keeps the index labels, so visibility is one label lookup
+        # rather than a set of every visible patient key.
+        if selected.empty or selected.index[0] not in working.index:
+            st.session_state.pop("selected_patient_key", None)
             st.markdown(
                 '<div class="empty-detail"><strong>Select a patient</strong><br>Clinical provenance, imaging time points, viewers, and retrieval routes will appear here.</div>',
                 unsafe_allow_html=True,
             )
         else:
-            selected_members = membership_rows[
-                membership_rows["patient_group_key"] == selected_key
-            ].copy()
+            selected_members = membership_rows.iloc[
+                membership_positions.get(selected_key, [])
+            ]
             render_patient_detail(
                 paths,
                 catalog,
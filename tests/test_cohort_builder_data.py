@@ -8,6 +8,7 @@ from pathlib import Path
 
 from cohort_builder_data import (
     DataPaths,
+    add_idc_viewer_urls,
     aggregate_idc,
     build_filtered_cohort_download,
     build_grouped_patient_index,
@@ -24,8 +25,11 @@ from cohort_builder_data import (
     load_idc_series,
     load_patient_idc,
     load_patient_nifti_packages,
+    manifest_download_target,
     normalize_dataset_key,
     normalize_subject_key,
+    preferred_object,
+    sqlite_objects,
     subject_join_key,
     subject_join_keys,
 )
@@ -228,6 +232,28 @@ class CohortBuilderDataTests(unittest.TestCase):
                         "StudyDate": "20200101",
                         "series_size_MB": 0.1,
                     },
+                    {
+                        "collection_id": "cbis_ddsm",
+                        "analysis_result_id": None,
+                        "PatientID": " Calc-Test_P_00038_LEFT_CC_1 ",
+                        "SeriesInstanceUID": "CBIS-38",
+                        "StudyInstanceUID": "STUDY-38",
+                        "Modality": "MG",
+                        "BodyPartExamined": "BREAST",
+                        "StudyDate": "20200101",
+                        "series_size_MB": 1.0,
+                    },
+                    {
+                        "collection_id": "cbis_ddsm",
+                        "analysis_result_id": None,
+                        "PatientID": "Calc-Test_P_00039_LEFT_CC_1",
+                        "SeriesInstanceUID": "CBIS-39",
+                        "StudyInstanceUID": "STUDY-39",
+                        "Modality": "MG",
+                        "BodyPartExamined": "BREAST",
+                        "StudyDate": "20200101",
+                        "series_size_MB": 1.0,
+                    },
                 ]
             ).to_parquet(parquet_path, index=False)
             catalog = pd.DataFrame(
@@ -240,13 +266,17 @@ class CohortBuilderDataTests(unittest.TestCase):
                         "short_title": "Derived-Result",
                         "dataset_key": normalize_dataset_key("Derived-Result"),
                     },
+                    {
+                        "short_title": "CBIS-DDSM",
+                        "dataset_key": normalize_dataset_key("CBIS-DDSM"),
+                    },
                 ]
             )
 
             expanded = load_idc_series(parquet_path, catalog)
             self.assertEqual(
                 set(expanded["short_title"]),
-                {"Source-Collection", "Derived-Result"},
+                {"Source-Collection", "Derived-Result", "CBIS-DDSM"},
             )
             self.assertEqual(
                 set(expanded.loc[
@@ -291,6 +321,51 @@ class CohortBuilderDataTests(unittest.TestCase):
             )
             self.assertEqual(set(source_detail["SeriesInstanceUID"]), {"ORIGINAL"})
 
+            projected = load_patient_idc(
+                paths,
+                catalog,
+                "Source-Collection",
+                "P1",
+                collection_id="source_collection",
+                direct_collection_only=True,
+                columns=["SeriesInstanceUID"],
+            )
+            self.assertEqual(set(projected["SeriesInstanceUID"]), {"ORIGINAL"})
+            self.assertNotIn("StudyInstanceUID", projected)
+
+            # Without a collection_id the PatientID spellings are resolved
+            # first and pushed down into the Parquet read.
+            self.assertEqual(
+                set(load_patient_idc(paths, catalog, "Derived-Result", "P1")[
+                    "SeriesInstanceUID"
+                ]),
+                {"DERIVED"},
+            )
+            self.assertEqual(
+                set(load_patient_idc(paths, catalog, "Source-Collection", " p1 ")[
+                    "SeriesInstanceUID"
+                ]),
+                {"ORIGINAL", "DERIVED"},
+            )
+            self.assertEqual(
+                set(load_patient_idc(
+                    paths,
+                    catalog,
+                    "Source-Collection",
+                    "P1",
+                    direct_collection_only=True,
+                )["SeriesInstanceUID"]),
+                {"ORIGINAL"},
+            )
+            aliased = load_patient_idc(paths, catalog, "CBIS-DDSM", "P_00038")
+            self.assertEqual(set(aliased["SeriesInstanceUID"]), {"CBIS-38"})
+            self.assertEqual(
+                set(aliased["subject_id"]), {"Calc-Test_P_00038_LEFT_CC_1"}
+            )
+            self.assertTrue(
+                load_patient_idc(paths, catalog, "CBIS-DDSM", "P_99999").empty
+            )
+
             route_patient = pd.DataFrame(
                 [
                     {
@@ -498,6 +573,21 @@ class CohortBuilderDataTests(unittest.TestCase):
             result = load_clinical_subjects(path)
             self.assertEqual(set(result["subject_id"]), {"P1", "P2"})
 
+    def test_sqlite_object_lookup_refreshes_when_cache_changes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "snapshot.sqlite"
+            with sqlite3.connect(path) as conn:
+                conn.execute("CREATE TABLE pathdb_rows (collection TEXT)")
+            self.assertEqual(sqlite_objects(path), {"pathdb_rows"})
+            with sqlite3.connect(path) as conn:
+                conn.execute(
+                    "CREATE VIEW agent_pathdb_slides AS SELECT * FROM pathdb_rows"
+                )
+            self.assertEqual(
+                preferred_object(path, "agent_pathdb_slides", "pathdb_rows"),
+                "agent_pathdb_slides",
+            )
+
     def test_clinical_aliases_collapse_and_preserve_source_ids(self):
         frame = pd.DataFrame(
             [
@@ -559,6 +649,54 @@ class CohortBuilderDataTests(unittest.TestCase):
             idc_viewer_url("1.2.3", "1.2.3.4", "SM", "open"),
         )
 
+    def test_vectorized_viewer_urls_match_scalar_viewer_url(self):
+        frame = pd.DataFrame(
+            {
+                "StudyInstanceUID": [
+                    "1.2.3", " 1.2.3 ", "1.2.3", None, float("nan"), "", "  ", "1.2 3"
+                ],
+                "SeriesInstanceUID": [
+                    "1.2.3.4", "1.2.3.4", " 1.2.3.5 ", "1.2.3.4", "1.2.3.4",
+                    "1.2.3.4", "1.2.3.4", "1.2.3.6",
+                ],
+                "Modality": ["SM", "sm", "CT", "SM", None, "CT", float("nan"), None],
+                "StudyDate": ["2001-02-03"] * 8,
+            }
+        )
+        frame = pd.concat(
+            [
+                frame,
+                pd.DataFrame(
+                    {
+                        "StudyInstanceUID": ["1.2.3", "1.2.3", "1.2.3"],
+                        "SeriesInstanceUID": [None, float("nan"), " "],
+                        "Modality": ["CT", "SM", "sm"],
+                        "StudyDate": [None] * 3,
+                    }
+                ),
+            ],
+            ignore_index=True,
+        )
+
+        urls = add_idc_viewer_urls(frame)["viewer_url"].tolist()
+
+        self.assertEqual(
+            urls,
+            [
+                idc_viewer_url(study, series, modality)
+                for study, series, modality in zip(
+                    frame["StudyInstanceUID"],
+                    frame["SeriesInstanceUID"],
+                    frame["Modality"],
+                )
+            ],
+        )
+        self.assertIn("/slim/studies/1.2.3/series/1.2.3.4", urls[1])
+        self.assertIn("initialSeriesInstanceUID=1.2.3.5", urls[2])
+        self.assertEqual(urls[3:7], [""] * 4)
+        self.assertIn("1.2%203", urls[7])
+        self.assertEqual(urls[8:], [""] * 3)
+
     def test_cart_deduplicates_by_route_and_value(self):
         item = cart_item(
             "dicom",
@@ -604,6 +742,7 @@ class CohortBuilderDataTests(unittest.TestCase):
         self.assertEqual(filename, "tcia_dicom_series.csv")
         self.assertEqual(mime, "text/csv")
         self.assertEqual(counts, {"SeriesInstanceUID": 1})
+        self.assertEqual(manifest_download_target([item]), (filename, mime))
 
     def test_mixed_routes_are_separate_files(self):
         items = [
@@ -638,6 +777,7 @@ class CohortBuilderDataTests(unittest.TestCase):
         payload, filename, mime, counts = build_manifest_download(items)
         self.assertEqual(filename, "tcia_data_retriever_manifests.zip")
         self.assertEqual(mime, "application/zip")
+        self.assertEqual(manifest_download_target(items), (filename, mime))
         with zipfile.ZipFile(io.BytesIO(payload)) as archive:
             names = set(archive.namelist())
             self.assertIn("tcia_dicom_series.csv", names)
@@ -648,6 +788,51 @@ class CohortBuilderDataTests(unittest.TestCase):
                 self.assertNotIn(",", header)
         self.assertEqual(sum(counts.values()), 3)
 
+    def test_manifests_with_csv_special_values_match_csv_writer(self):
+        def csv_writer_bytes(header, values):
+            text = io.StringIO(newline="")
+            writer = csv.writer(text, lineterminator="\n")
+            writer.writerow([header])
+            writer.writerows([value] for value in sorted(set(values)))
+            return text.getvalue().encode("utf-8")
+
+        urls = [
+            "https://example.org/a,b.svs",
+            'https://example.org/q"x.svs',
+            "https://example.org/plain.svs",
+        ]
+        items = [
+            cart_item(
+                "pathdb",
+                url,
+                short_title="TEST",
+                subject_id="P1",
+                label="Slide",
+                source="PathDB",
+                access_level="open",
+            )
+            for url in urls
+        ]
+        payload, _, mime, _ = build_manifest_download(items)
+        self.assertEqual(mime, "text/csv")
+        self.assertEqual(payload, csv_writer_bytes("imageUrl", urls))
+        self.assertIn(b'"https://example.org/q""x.svs"', payload)
+
+        series = ["1.2.4", "1.2.3", "1.2.3"]
+        payload, _, _, _ = build_filtered_cohort_download(
+            pd.DataFrame([{"short_title": "TEST", "subject_id": "P1"}]),
+            {"SeriesInstanceUID": series, "imageUrl": urls},
+        )
+        with zipfile.ZipFile(io.BytesIO(payload)) as archive:
+            self.assertEqual(
+                archive.read("tcia_pathdb_files.csv"),
+                csv_writer_bytes("imageUrl", urls),
+            )
+            self.assertEqual(
+                archive.read("tcia_dicom_series.csv"),
+                csv_writer_bytes("SeriesInstanceUID", series),
+            )
+
     def test_filtered_cohort_download_includes_patients_and_separate_routes(self):
         patients = pd.DataFrame(
             [
@@ -0,0 +1,93 @@
+import contextlib
+import io
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from fetch_data import (
+    IDC_COLUMNS,
+    IDC_VERSION_METADATA_KEY,
+    export_is_current,
+    refresh_idc_metadata,
+    stored_idc_version,
+)
+
+
+def write_index(path: Path, columns: list[str], version: str | None) -> None:
+    table = pa.table({column: pa.array([], pa.string()) for column in columns})
+    if version is not None:
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), IDC_VERSION_METADATA_KEY: version.encode()}
+        )
+    pq.write_table(table, path)
+
+
+class FakeClient:
+    def __init__(self, version: str):
+        self.version = version
+        self.queries: list[str] = []
+
+    def get_idc_version(self) -> str:
+        return self.version
+
+    def sql_query(self, query: str):
+        self.queries.append(query)
+        raise RuntimeError("export attempted")
+
+
+class RefreshSkipTests(unittest.TestCase):
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp.cleanup)
+        self.path = Path(self.temp.name) / "idc_metadata.parquet"
+
+    def refresh_with_version(self, version: str, force: bool = False) -> FakeClient:
+        client = FakeClient(version)
+        module = types.SimpleNamespace(
+            IDCClient=types.SimpleNamespace(client=lambda: client)
+        )
+        with mock.patch.dict(sys.modules, {"idc_index": module}), contextlib.redirect_stdout(
+            io.StringIO()
+        ):
+            try:
+                refresh_idc_metadata(self.path, force=force)
+            except RuntimeError:
+                pass
+        return client
+
+    def test_stored_version_is_read_from_schema_metadata(self):
+        self.assertIsNone(stored_idc_version(self.path))
+        write_index(self.path, IDC_COLUMNS, None)
+        self.assertIsNone(stored_idc_version(self.path))
+        write_index(self.path, IDC_COLUMNS, "v22")
+        self.assertEqual(stored_idc_version(self.path), "v22")
+
+    def test_export_is_current_requires_version_and_columns(self):
+        self.assertFalse(export_is_current(self.path, "v22"))
+        write_index(self.path, IDC_COLUMNS, None)
+        self.assertFalse(export_is_current(self.path, "v22"))
+        write_index(self.path, IDC_COLUMNS, "v21")
+        self.assertFalse(export_is_current(self.path, "v22"))
+        write_index(self.path, IDC_COLUMNS[:-1], "v22")
+        self.assertFalse(export_is_current(self.path, "v22"))
+        write_index(self.path, IDC_COLUMNS, "v22")
+        self.assertTrue(export_is_current(self.path, "v22"))
+
+    def test_refresh_skips_only_a_current_export(self):
+        self.assertTrue(self.refresh_with_version("v22").queries)
+        write_index(self.path, IDC_COLUMNS, None)
+        self.assertTrue(self.refresh_with_version("v22").queries)
+        write_index(self.path, IDC_COLUMNS, "v22")
+        self.assertEqual(self.refresh_with_version("v22").queries, [])
+        self.assertTrue(self.refresh_with_version("v23").queries)
+        self.assertTrue(self.refresh_with_version("v22", force=True).queries)
+
+
+if __name__ == "__main__":
+    unittest.main()